@@ -0,0 +1,106 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled table-row builders for generate_statement.py.
+
+Rows are built from the Investment and Payout records, whose amounts are
+already floats, and formatted from C doubles.
+"""
+from libc.math cimport fabs, floor, isfinite, rint, signbit
+from libc.string cimport memcpy
+from cpython.unicode cimport PyUnicode_DecodeASCII
+
+cdef const char* DIGIT_PAIRS = (
+    b"00010203040506070809"
+    b"10111213141516171819"
+    b"20212223242526272829"
+    b"30313233343536373839"
+    b"40414243444546474849"
+    b"50515253545556575859"
+    b"60616263646566676869"
+    b"70717273747576777879"
+    b"80818283848586878889"
+    b"90919293949596979899"
+)
+
+cdef enum:
+    BUF_SIZE = 40
+
+# Below this magnitude amount * 100 is accurate to well within TIE_MARGIN
+cdef double MAX_FAST_AMOUNT = 1e10
+cdef double TIE_MARGIN = 1e-3
+
+cpdef str format_currency(double amount):
+    """Same output as f"${amount:,.2f}", built with integer arithmetic.
+
+    Cents are written from a digit-pair table and the whole part digit by
+    digit with a comma every three. Amounts that land within TIE_MARGIN of
+    a half cent, where the scaled double cannot be trusted to round the
+    same way as Python's exact decimal conversion, are left to Python, as
+    are very large and non-finite values.
+    """
+    cdef char buf[BUF_SIZE]
+    cdef Py_ssize_t pos = BUF_SIZE
+    cdef unsigned long long cents, whole
+    cdef double scaled
+    cdef int digits = 0
+
+    if not isfinite(amount) or fabs(amount) >= MAX_FAST_AMOUNT:
+        return f"${amount:,.2f}"
+    scaled = fabs(amount) * 100.0
+    if fabs(scaled - floor(scaled) - 0.5) < TIE_MARGIN:
+        return f"${amount:,.2f}"
+
+    cents = <unsigned long long>rint(scaled)
+    whole = cents // 100
+
+    pos -= 2
+    memcpy(buf + pos, DIGIT_PAIRS + 2 * (cents % 100), 2)
+    pos -= 1
+    buf[pos] = b'.'
+
+    while True:
+        if digits == 3:
+            pos -= 1
+            buf[pos] = b','
+            digits = 0
+        pos -= 1
+        buf[pos] = <char>(48 + whole % 10)
+        whole //= 10
+        digits += 1
+        if whole == 0:
+            break
+
+    if signbit(amount):
+        pos -= 1
+        buf[pos] = b'-'
+    pos -= 1
+    buf[pos] = b'$'
+    return PyUnicode_DecodeASCII(buf + pos, BUF_SIZE - pos, NULL)
+
+def build_investment_rows(list investments):
+    cdef Py_ssize_t i, n = len(investments)
+    cdef list rows = [None] * n
+    cdef object inv
+    cdef double roi
+    for i in range(n):
+        inv = investments[i]
+        roi = inv.roi
+        rows[i] = [
+            inv.description,
+            inv.start_date,
+            format_currency(inv.amount),
+            f"{roi:.1f}%",
+        ]
+    return rows
+
+def build_payout_rows(list payouts):
+    cdef Py_ssize_t i, n = len(payouts)
+    cdef list rows = [None] * n
+    cdef object p
+    for i in range(n):
+        p = payouts[i]
+        rows[i] = [
+            p.month,
+            format_currency(p.amount),
+            p.status.capitalize(),
+        ]
+    return rows
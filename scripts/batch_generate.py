@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Render many PDFs in parallel.
+
+Usage: batch_generate.py <jobs_json_path>
+
+The input is a JSON array of jobs in pdf_worker.py's format,
+{"type": ..., "data": {...}, "output": ...}, without the "id". Prints one JSON
+object with a result per job, in input order.
+"""
+import sys
+import json
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Imported before the pool starts so forked workers share reportlab's pages
+from pdf_worker import handle
+from pdf_common import load_json
+
+def _render(job):
+    try:
+        return {"success": True, "path": handle(job)}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def generate_batch(jobs, max_workers=None):
+    if not isinstance(jobs, list):
+        raise ValueError("Batch input must be a JSON array of jobs")
+    if not jobs:
+        return []
+    # fork avoids re-importing reportlab in every worker
+    context = multiprocessing.get_context('fork') if sys.platform.startswith('linux') else None
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context) as ex:
+        return list(ex.map(_render, jobs, chunksize=8))
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python batch_generate.py <jobs_json_path>", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        jobs = load_json(sys.argv[1])
+
+        results = generate_batch(jobs)
+        print(json.dumps({"success": all(r["success"] for r in results), "results": results}))
+    except FileNotFoundError as e:
+        print(json.dumps({"success": False, "error": f"Input file not found: {str(e)}"}))
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
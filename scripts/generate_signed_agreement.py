@@ -1,101 +1,192 @@
 #!/usr/bin/env python3
 import sys
 import json
-import base64
+import hashlib
+import re
+from collections import OrderedDict
 from datetime import datetime
 from io import BytesIO
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, Image
 
-def generate_signed_agreement(data, output_path):
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=letter,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch
-    )
-    
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
+from pdf_common import (
+    BatchDocTemplate, assert_sample_styles_unmodified, load_json, sample_styles, write_pdf
+)
+
+# pybase64 uses a SIMD decoder; fall back to the standard library when absent
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+INK = colors.HexColor('#1a1a2e')
+MUTED = colors.HexColor('#444444')
+
+_base_styles = sample_styles()
+
+_STYLES = {
+    'title': ParagraphStyle(
         'CustomTitle',
-        parent=styles['Heading1'],
+        parent=_base_styles['Heading1'],
         fontSize=20,
         spaceAfter=20,
         alignment=1,
-        textColor=colors.HexColor('#1a1a2e')
-    )
-    
-    heading_style = ParagraphStyle(
+        textColor=INK
+    ),
+    'heading': ParagraphStyle(
         'CustomHeading',
-        parent=styles['Heading2'],
+        parent=_base_styles['Heading2'],
         fontSize=14,
         spaceBefore=15,
         spaceAfter=10,
-        textColor=colors.HexColor('#1a1a2e')
-    )
-    
-    body_style = ParagraphStyle(
+        textColor=INK
+    ),
+    'body': ParagraphStyle(
         'CustomBody',
-        parent=styles['Normal'],
+        parent=_base_styles['Normal'],
         fontSize=11,
         spaceAfter=8,
         leading=16
-    )
-    
-    legal_style = ParagraphStyle(
+    ),
+    'legal': ParagraphStyle(
         'LegalText',
-        parent=styles['Normal'],
+        parent=_base_styles['Normal'],
         fontSize=10,
         spaceAfter=6,
         leading=14,
-        textColor=colors.HexColor('#444444')
+        textColor=MUTED
+    ),
+}
+
+assert_sample_styles_unmodified()
+
+_INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+_SIG_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TEXTCOLOR', (0, 0), (-1, -1), MUTED),
+])
+
+# Blank (or whitespace-only) lines separate paragraphs in agreement content
+_BLANKLINE_RE = re.compile(r'\n\s*\n')
+
+SIGNATURE_WIDTH = 2.5*inch
+SIGNATURE_HEIGHT = 1*inch
+
+# Decoded signature images, keyed by content digest (least recently used first).
+# Every signing produces a new image, so the cache only helps with re-renders
+# of the same signature; keep it small and bounded by memory, not entries.
+_SIGNATURE_CACHE_ENTRIES = 4
+_SIGNATURE_CACHE_BYTES = 32 * 1024 * 1024
+_signature_readers = OrderedDict()
+_signature_cache_bytes = 0
+
+def _retained_bytes(sig_bytes, reader):
+    """Rough memory held by a reader once drawn.
+
+    The PNG stays in its BytesIO, and decoding keeps the PIL raster (up to
+    4 bytes per pixel), the RGB data (3) and a separate alpha channel (1).
+    """
+    width, height = reader.getSize()
+    return len(sig_bytes) + width * height * 8
+
+def _signature_reader(sig_bytes):
+    """Return a shared ImageReader for the PNG bytes, decoding each image once."""
+    global _signature_cache_bytes
+    key = hashlib.blake2b(sig_bytes).digest()
+    entry = _signature_readers.get(key)
+    if entry is not None:
+        _signature_readers.move_to_end(key)
+        return entry[0]
+
+    reader = ImageReader(BytesIO(sig_bytes))
+    size = _retained_bytes(sig_bytes, reader)
+    if size > _SIGNATURE_CACHE_BYTES:
+        return reader
+    _signature_readers[key] = (reader, size)
+    _signature_cache_bytes += size
+    while (len(_signature_readers) > _SIGNATURE_CACHE_ENTRIES
+           or _signature_cache_bytes > _SIGNATURE_CACHE_BYTES):
+        _, (_, evicted) = _signature_readers.popitem(last=False)
+        _signature_cache_bytes -= evicted
+    return reader
+
+class _SignatureImage(Image):
+    """Image flowable drawn from an existing ImageReader instead of a new one.
+
+    platypus.Image treats any argument without .read() as a filename, so it
+    cannot take an ImageReader directly. Instead the reader is pre-seeded as
+    _img: Image only creates its reader lazily, in __getattr__('_img'), when
+    the attribute is missing, and draw() passes self._img to drawImage.
+    """
+    def __init__(self, reader, width, height):
+        self._img = reader
+        Image.__init__(self, reader.fp, width=width, height=height)
+
+def generate_signed_agreement(data, output_path):
+    buf = BytesIO()
+    doc = BatchDocTemplate(
+        buf,
+        pagesize=letter,
+        rightMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch
     )
     
+    title_style = _STYLES['title']
+    heading_style = _STYLES['heading']
+    body_style = _STYLES['body']
+    legal_style = _STYLES['legal']
+    now = datetime.now()
+    
     elements = []
+    add = elements.append
     
-    elements.append(Paragraph("INVESTMENT AGREEMENT", title_style))
-    elements.append(Spacer(1, 10))
+    add(Paragraph("INVESTMENT AGREEMENT", title_style))
+    add(Spacer(1, 10))
     
-    elements.append(Paragraph(data.get('title', 'Investment Agreement'), heading_style))
-    elements.append(Spacer(1, 15))
+    add(Paragraph(data.get('title', 'Investment Agreement'), heading_style))
+    add(Spacer(1, 15))
     
     info_data = [
         ['Investor Name:', data.get('investorName', 'N/A')],
         ['Email:', data.get('investorEmail', 'N/A')],
         ['Investment Amount:', f"${data.get('investmentAmount', 0):,.2f}"],
-        ['Agreement Date:', datetime.now().strftime('%B %d, %Y')]
+        ['Agreement Date:', now.strftime('%B %d, %Y')]
     ]
     
     info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    elements.append(info_table)
-    elements.append(Spacer(1, 20))
-    
-    elements.append(Paragraph("Terms and Conditions", heading_style))
+    info_table.setStyle(_INFO_TABLE_STYLE)
+    add(info_table)
+    add(Spacer(1, 20))
+    
+    add(Paragraph("Terms and Conditions", heading_style))
     
     content = data.get('content', '')
-    paragraphs = content.split('\n')
-    for para in paragraphs:
-        if para.strip():
-            elements.append(Paragraph(para.strip(), body_style))
+    for block in _BLANKLINE_RE.split(content):
+        lines = [line.strip() for line in block.split('\n') if line.strip()]
+        if lines:
+            add(Paragraph('<br/>'.join(lines), body_style))
     
-    elements.append(Spacer(1, 30))
+    add(Spacer(1, 30))
     
-    elements.append(Paragraph("Acknowledgment", heading_style))
-    elements.append(Paragraph(
+    add(Paragraph("Acknowledgment", heading_style))
+    add(Paragraph(
         f"I, {data.get('investorName', 'the undersigned')}, acknowledge that I have read, understood, "
         "and agree to be bound by all terms and conditions set forth in this Investment Agreement. "
         "I confirm that I am investing the amount specified above of my own free will and understand "
@@ -103,29 +194,32 @@ def generate_signed_agreement(data, output_path):
         legal_style
     ))
     
-    elements.append(Spacer(1, 30))
+    add(Spacer(1, 30))
     
-    elements.append(Paragraph("Digital Signature", heading_style))
+    add(Paragraph("Digital Signature", heading_style))
     
     signature_data = data.get('signatureData', '')
     if signature_data and signature_data.startswith('data:image/'):
         try:
-            header, encoded = signature_data.split(',', 1)
-            sig_bytes = base64.b64decode(encoded)
-            sig_image = Image(BytesIO(sig_bytes), width=2.5*inch, height=1*inch)
-            elements.append(sig_image)
+            # The data URL prefix is short, so only scan its first few bytes for the comma
+            comma = signature_data.find(',', 0, 64)
+            if comma < 0:
+                raise ValueError("Malformed signature data URL")
+            sig_bytes = b64decode(signature_data[comma + 1:], validate=False)
+            sig_image = _SignatureImage(_signature_reader(sig_bytes), SIGNATURE_WIDTH, SIGNATURE_HEIGHT)
+            add(sig_image)
         except Exception as e:
-            elements.append(Paragraph("[Signature could not be rendered]", body_style))
+            add(Paragraph("[Signature could not be rendered]", body_style))
     else:
-        elements.append(Paragraph("[No signature provided]", body_style))
+        add(Paragraph("[No signature provided]", body_style))
     
-    elements.append(Spacer(1, 10))
+    add(Spacer(1, 10))
     
-    signed_date = data.get('signedDate', datetime.now().isoformat())
+    signed_date = data.get('signedDate', now.isoformat())
     try:
         dt = datetime.fromisoformat(signed_date.replace('Z', '+00:00'))
         formatted_date = dt.strftime('%B %d, %Y at %I:%M %p')
-    except:
+    except (ValueError, AttributeError):
         formatted_date = signed_date
     
     sig_details = [
@@ -135,24 +229,19 @@ def generate_signed_agreement(data, output_path):
     ]
     
     sig_table = Table(sig_details, colWidths=[1.5*inch, 4*inch])
-    sig_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#444444')),
-    ]))
-    elements.append(sig_table)
-    
-    elements.append(Spacer(1, 40))
-    
-    elements.append(Paragraph(
+    sig_table.setStyle(_SIG_TABLE_STYLE)
+    add(sig_table)
+    
+    add(Spacer(1, 40))
+    
+    add(Paragraph(
         "This document was electronically signed and is legally binding. "
         "A copy has been stored securely for your records.",
         legal_style
     ))
     
     doc.build(elements)
+    write_pdf(buf, output_path)
 
 if __name__ == '__main__':
     if len(sys.argv) != 3:
@@ -163,8 +252,7 @@ if __name__ == '__main__':
         input_path = sys.argv[1]
         output_path = sys.argv[2]
         
-        with open(input_path, 'r') as f:
-            data = json.load(f)
+        data = load_json(input_path)
         
         generate_signed_agreement(data, output_path)
         print(f"Signed agreement generated: {output_path}")
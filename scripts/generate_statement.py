@@ -1,51 +1,188 @@
 #!/usr/bin/env python3
 import sys
-import json
 import os
+from dataclasses import dataclass
 from datetime import datetime
+from io import BytesIO
+from itertools import islice
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.platypus import Paragraph, Spacer, Table, LongTable, TableStyle, Image
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 
+from pdf_common import (
+    BatchDocTemplate, assert_sample_styles_unmodified, load_json, sample_styles,
+    stale_extension, write_json_line, write_pdf
+)
+
+NAVY = colors.HexColor('#1e3a5f')
+SUMMARY_FILL = colors.HexColor('#f0f4f8')
+GRID_LINE = colors.HexColor('#cccccc')
+ROW_STRIPE = colors.HexColor('#f8f9fa')
+
+_base_styles = sample_styles()
+
+_STYLES = {
+    'title': ParagraphStyle('Title', parent=_base_styles['Title'], fontSize=24, spaceAfter=20, alignment=TA_CENTER),
+    'heading': ParagraphStyle('Heading', parent=_base_styles['Heading2'], fontSize=14, spaceBefore=20, spaceAfter=10),
+    'subtitle': _base_styles['Heading2'],
+    'normal': _base_styles['Normal'],
+    'right': ParagraphStyle('Right', parent=_base_styles['Normal'], alignment=TA_RIGHT),
+    'footer': ParagraphStyle('Footer', parent=_base_styles['Normal'], fontSize=9, textColor=colors.gray, alignment=TA_CENTER),
+}
+
+assert_sample_styles_unmodified()
+
+_HEADER_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BACKGROUND', (0, -1), (-1, -1), SUMMARY_FILL),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 0.5, GRID_LINE),
+])
+
+_INVESTMENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, GRID_LINE),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, ROW_STRIPE]),
+])
+
+_PAYOUT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('ALIGN', (2, 0), (2, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, GRID_LINE),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, ROW_STRIPE]),
+])
+
+@dataclass(slots=True, frozen=True)
+class Investment:
+    description: str
+    start_date: str
+    amount: float
+    roi: float
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d.get('description', 'Investment'),
+            d.get('startDate', '-'),
+            float(d.get('amount', 0)),
+            float(d.get('roi', 0))
+        )
+
+@dataclass(slots=True, frozen=True)
+class Payout:
+    month: str
+    amount: float
+    status: str
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get('month', '-'), float(d.get('amount', 0)), d.get('status', '-'))
+
+# Shared formatters for currency and percentage cells; binding .format once
+# only saves the attribute lookup per call
+_fmt_currency = "${:,.2f}".format
+_fmt_percent = "{:.1f}%".format
+
+def _build_investment_rows(investments):
+    return [
+        [inv.description, inv.start_date, _fmt_currency(inv.amount), _fmt_percent(inv.roi)]
+        for inv in investments
+    ]
+
+def _build_payout_rows(payouts):
+    return [
+        [p.month, _fmt_currency(p.amount), p.status.capitalize()]
+        for p in payouts
+    ]
+
+# Use the compiled row builders when scripts/_rows.pyx has been built and
+# the build is not older than the .pyx
+try:
+    if stale_extension('_rows', '_rows.pyx'):
+        raise ImportError("_rows build is older than _rows.pyx")
+    from _rows import build_investment_rows, build_payout_rows
+except ImportError:
+    build_investment_rows = _build_investment_rows
+    build_payout_rows = _build_payout_rows
+
+# Long tables are split so reportlab never lays out more rows than this at once
+TABLE_CHUNK_ROWS = 200
+
+def _long_tables(header, rows, col_widths, style):
+    """Build LongTables of at most TABLE_CHUNK_ROWS rows, each repeating the header."""
+    tables = []
+    remaining = iter(rows)
+    while True:
+        # Fill each chunk's table data in place rather than slicing and concatenating
+        table_data = [header]
+        table_data.extend(islice(remaining, TABLE_CHUNK_ROWS))
+        if len(table_data) == 1:
+            break
+        table = LongTable(table_data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        tables.append(table)
+    return tables
+
 def generate_statement(data, output_path):
-    doc = SimpleDocTemplate(output_path, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
-    styles = getSampleStyleSheet()
+    buf = BytesIO()
+    doc = BatchDocTemplate(buf, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
     
-    title_style = ParagraphStyle('Title', parent=styles['Title'], fontSize=24, spaceAfter=20, alignment=TA_CENTER)
-    heading_style = ParagraphStyle('Heading', parent=styles['Heading2'], fontSize=14, spaceBefore=20, spaceAfter=10)
-    normal_style = styles['Normal']
-    right_style = ParagraphStyle('Right', parent=styles['Normal'], alignment=TA_RIGHT)
+    title_style = _STYLES['title']
+    heading_style = _STYLES['heading']
+    normal_style = _STYLES['normal']
     
     elements = []
+    add = elements.append
     
-    elements.append(Paragraph("InvestorHub", title_style))
-    elements.append(Paragraph("Monthly Investment Statement", styles['Heading2']))
-    elements.append(Spacer(1, 0.3*inch))
+    add(Paragraph("InvestorHub", title_style))
+    add(Paragraph("Monthly Investment Statement", _STYLES['subtitle']))
+    add(Spacer(1, 0.3*inch))
     
     investor_name = data.get('investorName', 'Investor')
     investor_email = data.get('investorEmail', '')
-    statement_month = data.get('month', datetime.now().strftime('%B %Y'))
-    generated_date = datetime.now().strftime('%B %d, %Y')
+    now = datetime.now()
+    statement_month = data.get('month', now.strftime('%B %Y'))
+    generated_date = now.strftime('%B %d, %Y')
     
     header_data = [
         ['Investor:', investor_name, 'Statement Period:', statement_month],
         ['Email:', investor_email, 'Generated:', generated_date],
     ]
     header_table = Table(header_data, colWidths=[1.2*inch, 2.5*inch, 1.3*inch, 2*inch])
-    header_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    elements.append(header_table)
-    elements.append(Spacer(1, 0.4*inch))
-    
-    elements.append(Paragraph("Account Summary", heading_style))
+    header_table.setStyle(_HEADER_TABLE_STYLE)
+    add(header_table)
+    add(Spacer(1, 0.4*inch))
+    
+    add(Paragraph("Account Summary", heading_style))
     
     opening_balance = float(data.get('openingBalance', 0))
     returns = float(data.get('returns', 0))
@@ -53,100 +190,55 @@ def generate_statement(data, output_path):
     closing_balance = float(data.get('closingBalance', 0))
     roi = float(data.get('roi', 0))
     
-    def format_currency(amount):
-        return f"${amount:,.2f}"
-    
     summary_data = [
         ['Description', 'Amount'],
-        ['Opening Balance', format_currency(opening_balance)],
-        ['Investment Returns', format_currency(returns)],
-        ['Payouts Received', f"({format_currency(payouts)})"],
-        ['Closing Balance', format_currency(closing_balance)],
+        ['Opening Balance', _fmt_currency(opening_balance)],
+        ['Investment Returns', _fmt_currency(returns)],
+        ['Payouts Received', f"({_fmt_currency(payouts)})"],
+        ['Closing Balance', _fmt_currency(closing_balance)],
     ]
     
     summary_table = Table(summary_data, colWidths=[4*inch, 2.5*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a5f')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 10),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f0f4f8')),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-    ]))
-    elements.append(summary_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    elements.append(Paragraph("Investment Details", heading_style))
-    
-    investments = data.get('investments', [])
+    summary_table.setStyle(_SUMMARY_TABLE_STYLE)
+    add(summary_table)
+    add(Spacer(1, 0.3*inch))
+    
+    add(Paragraph("Investment Details", heading_style))
+    
+    investments = [Investment.from_dict(d) for d in data.get('investments', [])]
     if investments:
-        inv_data = [['Description', 'Start Date', 'Amount', 'ROI']]
-        for inv in investments:
-            inv_data.append([
-                inv.get('description', 'Investment'),
-                inv.get('startDate', '-'),
-                format_currency(float(inv.get('amount', 0))),
-                f"{float(inv.get('roi', 0)):.1f}%"
-            ])
-        
-        inv_table = Table(inv_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch, 1*inch])
-        inv_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a5f')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-        ]))
-        elements.append(inv_table)
+        elements.extend(_long_tables(
+            ['Description', 'Start Date', 'Amount', 'ROI'],
+            build_investment_rows(investments),
+            [2.5*inch, 1.5*inch, 1.5*inch, 1*inch],
+            _INVESTMENT_TABLE_STYLE
+        ))
     else:
-        elements.append(Paragraph("No active investments for this period.", normal_style))
+        add(Paragraph("No active investments for this period.", normal_style))
     
-    elements.append(Spacer(1, 0.3*inch))
+    add(Spacer(1, 0.3*inch))
     
-    elements.append(Paragraph("Payout History", heading_style))
+    add(Paragraph("Payout History", heading_style))
     
-    payout_list = data.get('payoutList', [])
+    payout_list = [Payout.from_dict(d) for d in data.get('payoutList', [])]
     if payout_list:
-        payout_data = [['Month', 'Amount', 'Status']]
-        for p in payout_list:
-            payout_data.append([
-                p.get('month', '-'),
-                format_currency(float(p.get('amount', 0))),
-                p.get('status', '-').capitalize()
-            ])
-        
-        payout_table = Table(payout_data, colWidths=[2.5*inch, 2*inch, 2*inch])
-        payout_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a5f')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('ALIGN', (2, 0), (2, -1), 'CENTER'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-        ]))
-        elements.append(payout_table)
+        elements.extend(_long_tables(
+            ['Month', 'Amount', 'Status'],
+            build_payout_rows(payout_list),
+            [2.5*inch, 2*inch, 2*inch],
+            _PAYOUT_TABLE_STYLE
+        ))
     else:
-        elements.append(Paragraph("No payouts recorded for this period.", normal_style))
+        add(Paragraph("No payouts recorded for this period.", normal_style))
     
-    elements.append(Spacer(1, 0.5*inch))
+    add(Spacer(1, 0.5*inch))
     
-    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9, textColor=colors.gray, alignment=TA_CENTER)
-    elements.append(Paragraph("This statement is for informational purposes only.", footer_style))
-    elements.append(Paragraph(f"Generated by InvestorHub on {generated_date}", footer_style))
+    footer_style = _STYLES['footer']
+    add(Paragraph("This statement is for informational purposes only.", footer_style))
+    add(Paragraph(f"Generated by InvestorHub on {generated_date}", footer_style))
     
     doc.build(elements)
+    write_pdf(buf, output_path)
     return output_path
 
 if __name__ == '__main__':
@@ -158,14 +250,13 @@ if __name__ == '__main__':
         input_path = sys.argv[1]
         output_path = sys.argv[2]
         
-        with open(input_path, 'r') as f:
-            data = json.load(f)
+        data = load_json(input_path)
         
         result = generate_statement(data, output_path)
-        print(json.dumps({"success": True, "path": result}))
+        write_json_line({"success": True, "path": result})
     except FileNotFoundError as e:
-        print(json.dumps({"success": False, "error": f"Input file not found: {str(e)}"}))
+        write_json_line({"success": False, "error": f"Input file not found: {str(e)}"})
         sys.exit(1)
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        write_json_line({"success": False, "error": str(e)})
         sys.exit(1)
@@ -0,0 +1,158 @@
+"""Helpers shared by the PDF generators."""
+import functools
+import importlib
+import importlib.machinery
+import importlib.util
+import json
+import mmap
+import os
+import sys
+
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfgen import canvas
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, SimpleDocTemplate
+from reportlab.platypus.doctemplate import _doNothing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def stale_extension(name, source):
+    """True when a compiled build of `name` is older than `source` in scripts/."""
+    spec = importlib.util.find_spec(name)
+    if spec is None or not isinstance(spec.loader, importlib.machinery.ExtensionFileLoader):
+        return False
+    source_path = os.path.join(_SCRIPTS_DIR, source)
+    return os.path.exists(source_path) and os.path.getmtime(spec.origin) < os.path.getmtime(source_path)
+
+def import_script(name):
+    """Import a module from scripts/, preferring its .py over an out-of-date build.
+
+    A compiled extension shadows the .py beside it, so without this check
+    edits to the source would be ignored until someone rebuilt.
+    """
+    if not stale_extension(name, name + '.py'):
+        return importlib.import_module(name)
+    print(f"{name}: compiled module is older than {name}.py, using the source; "
+          "rebuild with 'python setup.py build_ext --inplace'", file=sys.stderr)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(_SCRIPTS_DIR, name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+# Below this size a plain read is cheaper than setting up a mapping
+MMAP_MIN_BYTES = 64 * 1024
+
+def loads_json(data):
+    """Parse JSON from str, bytes or a memoryview, preferring orjson."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            # orjson rejects lone surrogates, which JSON.stringify emits for
+            # unpaired surrogates in user text; the standard parser accepts them
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+def load_json(path):
+    """Parse a JSON input file.
+
+    Large files are memory-mapped and handed to orjson without copying them
+    into a Python bytes object first.
+    """
+    with open(path, 'rb') as f:
+        if orjson is None or os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+            return loads_json(f.read())
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            with memoryview(mm) as view:
+                return loads_json(view)
+        finally:
+            mm.close()
+
+def write_pdf(buf, output_path):
+    """Write a PDF rendered into a BytesIO to output_path in one call.
+
+    The default buffered writer passes a payload this large straight to the
+    OS, and unlike a raw FileIO it retries short writes and raises on failure.
+    """
+    with open(output_path, 'wb') as f:
+        f.write(buf.getbuffer())
+
+def dumps_json(obj):
+    """Serialize obj to compact JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson refuses lone surrogates; the standard encoder escapes them
+            pass
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def write_json_line(obj):
+    """Write obj to stdout as one NDJSON line, bypassing the text layer."""
+    out = sys.stdout.buffer
+    out.write(dumps_json(obj) + b"\n")
+    out.flush()
+
+@functools.lru_cache(maxsize=1)
+def sample_styles():
+    """reportlab's sample stylesheet, built once per process.
+
+    Callers only read from it or use its styles as parents, so one instance
+    is shared by every generator loaded into the same worker.
+    """
+    return getSampleStyleSheet()
+
+def _style_snapshot(stylesheet):
+    return {name: dict(vars(style)) for name, style in stylesheet.byName.items()}
+
+_PRISTINE_STYLES = _style_snapshot(sample_styles())
+
+def assert_sample_styles_unmodified():
+    """Fail if a generator added to or edited the shared sample stylesheet.
+
+    Generators call this at import, after building their own styles, since
+    a change made by one would silently leak into every other document.
+    """
+    assert _style_snapshot(sample_styles()) == _PRISTINE_STYLES, \
+        "the shared sample stylesheet must not be modified; derive a ParagraphStyle instead"
+
+class BatchDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that reuses its page templates across documents.
+
+    SimpleDocTemplate builds a new frame and a pair of page templates for
+    every document. Here they are built once per page geometry and shared.
+    Frames are reset at the start of each page, so sequential builds are
+    safe. Documents must not be built concurrently in one process; the
+    worker and batch driver build one document at a time per process.
+
+    Page callbacks are stored on the templates themselves, so documents that
+    pass onFirstPage/onLaterPages (or set them as attributes) get their own
+    templates through the parent implementation.
+    """
+    _shared_templates = {}
+
+    def build(self, flowables, onFirstPage=_doNothing, onLaterPages=_doNothing, canvasmaker=canvas.Canvas):
+        if (onFirstPage is not _doNothing or onLaterPages is not _doNothing
+                or hasattr(self, 'onFirstPage') or hasattr(self, 'onLaterPages')):
+            SimpleDocTemplate.build(self, flowables, onFirstPage, onLaterPages, canvasmaker)
+            return
+        self._calc()
+        key = (tuple(self.pagesize), self.leftMargin, self.bottomMargin, self.width, self.height)
+        templates = self._shared_templates.get(key)
+        if templates is None:
+            frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+            templates = [
+                PageTemplate(id='First', frames=frame, pagesize=self.pagesize),
+                PageTemplate(id='Later', frames=frame, pagesize=self.pagesize),
+            ]
+            self._shared_templates[key] = templates
+        self.addPageTemplates(templates)
+        BaseDocTemplate.build(self, flowables, canvasmaker=canvasmaker)
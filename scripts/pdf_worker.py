@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Long-lived PDF worker.
+
+Reads newline-delimited JSON jobs from stdin and writes one JSON result line
+per job to stdout, so the server pays the interpreter and reportlab import
+cost once instead of once per document.
+
+Job:    {"id": 1, "type": "statement", "data": {...}, "output": "/path/out.pdf"}
+Result: {"id": 1, "success": true, "path": "/path/out.pdf"}
+        {"id": 1, "success": false, "error": "..."}
+"""
+import sys
+
+from pdf_common import import_script, loads_json, write_json_line
+
+generate_statement = import_script('generate_statement').generate_statement
+generate_signed_agreement = import_script('generate_signed_agreement').generate_signed_agreement
+
+DISPATCH = {
+    'statement': generate_statement,
+    'signed_agreement': generate_signed_agreement,
+}
+
+def handle(job):
+    job_type = job.get('type')
+    handler = DISPATCH.get(job_type)
+    if handler is None:
+        raise ValueError(f"Unknown job type: {job_type}")
+    output_path = job.get('output')
+    if not output_path:
+        raise ValueError("Job is missing its output path")
+    handler(job['data'], output_path)
+    return output_path
+
+def main():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job_id = None
+        try:
+            job = loads_json(line)
+            job_id = job.get('id')
+            result = {"id": job_id, "success": True, "path": handle(job)}
+        except Exception as e:
+            result = {"id": job_id, "success": False, "error": str(e)}
+        write_json_line(result)
+
+if __name__ == '__main__':
+    main()
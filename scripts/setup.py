@@ -0,0 +1,25 @@
+"""Build the optional compiled helpers for the PDF scripts.
+
+    cd scripts && python setup.py build_ext --inplace
+
+Besides the _rows helpers, the generator modules themselves are compiled
+as-is. The import system prefers a built extension over the .py beside it,
+so the worker and batch driver pick up the compiled modules automatically
+and fall back to pure Python when the extensions are not built. A build
+older than its source is ignored in favour of the source (see
+pdf_common.import_script), so rebuild after editing. Running a generator
+directly as a script always uses the .py.
+
+Compiler directives such as boundscheck live in the _rows.pyx header; the
+generator modules are plain Python and keep Cython's safe defaults.
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='investorhub-pdf-scripts',
+    ext_modules=cythonize(
+        ['_rows.pyx', 'generate_statement.py', 'generate_signed_agreement.py'],
+        language_level=3,
+    ),
+)
@@ -0,0 +1,170 @@
+/**
+ * PDF Worker Client
+ *
+ * Keeps a single long-lived `scripts/pdf_worker.py` process running and
+ * pipes newline-delimited JSON jobs to it, instead of spawning a fresh
+ * Python interpreter (and re-importing ReportLab) for every PDF.
+ *
+ * The worker renders one document at a time, so jobs are queued here and
+ * sent one by one. Each job's timeout starts when it is sent, matching the
+ * per-call timeout of the old spawnSync approach. The worker exits on its
+ * own when the server process goes away and its stdin closes.
+ */
+
+import { spawn, type ChildProcessWithoutNullStreams } from 'child_process';
+import path from 'path';
+import readline from 'readline';
+
+export type PdfJobType = 'statement' | 'signed_agreement';
+
+interface PdfJob {
+  id: number;
+  type: PdfJobType;
+  data: unknown;
+  outputPath: string;
+  resolve: (outputPath: string) => void;
+  reject: (error: Error) => void;
+}
+
+interface WorkerResult {
+  id: number | null;
+  success: boolean;
+  path?: string;
+  error?: string;
+}
+
+const JOB_TIMEOUT_MS = 30000;
+
+let worker: ChildProcessWithoutNullStreams | null = null;
+let nextJobId = 1;
+const queue: PdfJob[] = [];
+let running: { job: PdfJob; timer: NodeJS.Timeout } | null = null;
+
+/**
+ * Settle the job currently being rendered and move on to the next one
+ */
+function finishRunning(error: Error | null, outputPath?: string): void {
+  if (!running) {
+    return;
+  }
+  const { job, timer } = running;
+  running = null;
+  clearTimeout(timer);
+
+  if (error) {
+    job.reject(error);
+  } else {
+    job.resolve(outputPath!);
+  }
+  sendNext();
+}
+
+function handleResult(result: WorkerResult): void {
+  if (!running) {
+    return;
+  }
+  // A line the worker could not parse comes back without an id; with one
+  // job in flight it can only belong to the running job
+  if (result.id !== null && result.id !== running.job.id) {
+    console.error('[PDF Worker] Result for unknown job:', result.id);
+    return;
+  }
+
+  if (result.success && result.path) {
+    finishRunning(null, result.path);
+  } else {
+    finishRunning(new Error(result.error || 'PDF generation failed'));
+  }
+}
+
+function getWorker(): ChildProcessWithoutNullStreams {
+  if (worker) {
+    return worker;
+  }
+
+  const scriptPath = path.join(process.cwd(), 'scripts', 'pdf_worker.py');
+  const child = spawn('python3', [scriptPath], { stdio: ['pipe', 'pipe', 'pipe'] });
+
+  readline.createInterface({ input: child.stdout }).on('line', (line) => {
+    let result: WorkerResult;
+    try {
+      result = JSON.parse(line);
+    } catch {
+      console.error('[PDF Worker] Unparseable output:', line);
+      return;
+    }
+    handleResult(result);
+  });
+
+  child.stderr.on('data', (chunk) => {
+    console.error('[PDF Worker]', chunk.toString().trimEnd());
+  });
+
+  child.stdin.on('error', (err) => {
+    console.error('[PDF Worker] stdin error:', err.message);
+  });
+
+  child.on('error', (err) => {
+    console.error('[PDF Worker] Failed to start:', err.message);
+    if (worker !== child) {
+      return;
+    }
+    worker = null;
+    // python3 itself is unavailable, so nothing queued can succeed either
+    const error = new Error(`PDF worker failed to start: ${err.message}`);
+    const waiting = queue.splice(0);
+    finishRunning(error);
+    waiting.forEach((job) => job.reject(error));
+  });
+
+  child.on('exit', (code, signal) => {
+    console.log(`[PDF Worker] Exited (code=${code}, signal=${signal})`);
+    if (worker !== child) {
+      return;
+    }
+    worker = null;
+    // Only the job being rendered is lost; queued jobs go to a new worker
+    finishRunning(new Error('PDF worker exited unexpectedly'));
+  });
+
+  worker = child;
+  return child;
+}
+
+function sendNext(): void {
+  if (running) {
+    return;
+  }
+  const job = queue.shift();
+  if (!job) {
+    return;
+  }
+
+  const child = getWorker();
+  const timer = setTimeout(() => {
+    if (running?.job !== job) {
+      return;
+    }
+    // The worker is stuck on this job; detach and kill it so the jobs
+    // behind it go to a fresh worker
+    if (worker === child) {
+      worker = null;
+    }
+    child.kill();
+    finishRunning(new Error('PDF generation timed out'));
+  }, JOB_TIMEOUT_MS);
+
+  running = { job, timer };
+  child.stdin.write(JSON.stringify({ id: job.id, type: job.type, data: job.data, output: job.outputPath }) + '\n');
+}
+
+/**
+ * Render a PDF through the shared worker process.
+ * Resolves with the output path once the document has been written.
+ */
+export function renderPdf(type: PdfJobType, data: unknown, outputPath: string): Promise<string> {
+  return new Promise((resolve, reject) => {
+    queue.push({ id: nextJobId++, type, data, outputPath, resolve, reject });
+    sendNext();
+  });
+}
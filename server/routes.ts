@@ -7,9 +7,9 @@ import MemoryStore from "memorystore";
 import multer from "multer";
 import path from "path";
 import fs from "fs";
-import { spawnSync } from "child_process";
 import * as mifosService from "./mifos-service";
 import { syncMifosData, isSyncRunning } from "./mifos-scheduler";
+import { renderPdf } from "./pdf-worker";
 
 const SessionStore = MemoryStore(session);
 
@@ -630,28 +630,13 @@ export async function registerRoutes(
 
       const filename = `statement_${userId}_${Date.now()}.pdf`;
       const outputPath = path.join(statementsDir, filename);
-      const jsonInputPath = path.join(statementsDir, `input_${userId}_${Date.now()}.json`);
-      
-      fs.writeFileSync(jsonInputPath, JSON.stringify(statementData));
-      
-      const scriptPath = path.join(process.cwd(), 'scripts', 'generate_statement.py');
       
       try {
-        const result = spawnSync('python3', [scriptPath, jsonInputPath, outputPath], {
-          encoding: 'utf-8',
-          timeout: 30000
-        });
-        
-        if (result.error || result.status !== 0) {
-          throw new Error(result.stderr || result.error?.message || 'PDF generation failed');
-        }
+        await renderPdf('statement', statementData, outputPath);
       } catch (execError: any) {
         console.error('PDF generation error:', execError.message);
-        fs.unlink(jsonInputPath, () => {});
         return res.status(500).json({ message: 'Failed to generate PDF statement' });
       }
-      
-      fs.unlink(jsonInputPath, () => {});
 
       res.setHeader('Content-Type', 'application/pdf');
       res.setHeader('Content-Disposition', `attachment; filename="InvestorHub_Statement_${month.replace(/ /g, '_')}.pdf"`);
@@ -784,7 +769,6 @@ export async function registerRoutes(
       // Generate signed PDF
       const filename = `signed_agreement_${agreementId}_${Date.now()}.pdf`;
       const outputPath = path.join(signedDocsDir, filename);
-      const inputPath = path.join(signedDocsDir, `input_${agreementId}_${Date.now()}.json`);
       
       const signatureInput = {
         title: agreement.title,
@@ -796,27 +780,13 @@ export async function registerRoutes(
         signedDate: new Date().toISOString()
       };
       
-      fs.writeFileSync(inputPath, JSON.stringify(signatureInput));
-      
-      const scriptPath = path.join(process.cwd(), 'scripts', 'generate_signed_agreement.py');
-      
       try {
-        const result = spawnSync('python3', [scriptPath, inputPath, outputPath], {
-          encoding: 'utf-8',
-          timeout: 30000
-        });
-        
-        if (result.error || result.status !== 0) {
-          throw new Error(result.stderr || result.error?.message || 'PDF generation failed');
-        }
+        await renderPdf('signed_agreement', signatureInput, outputPath);
       } catch (execError: any) {
         console.error('PDF signing error:', execError.message);
-        fs.unlink(inputPath, () => {});
         return res.status(500).json({ message: 'Failed to generate signed agreement PDF' });
       }
       
-      fs.unlink(inputPath, () => {});
-      
       const signedAgreement = await storage.signAgreement(agreementId, signatureData, filename);
       
       if (!signedAgreement) {